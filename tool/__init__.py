@@ -1,3 +1,5 @@
 """MSSQL Backup Tool - A Unix-style tool for MSSQL backup operations."""
 
-__version__ = "0.2.0"
+from typing import Final
+
+__version__: Final[str] = "0.2.0"
@@ -1,11 +1,28 @@
 """
 Main entry point for the MSSQL Backup Tool.
+
+Selects the operation mode from TOOL_MODE and defers the heavy imports
+(pymssql, patoolib, watchdog) until the mode is known, so startup only
+pays for the code path that actually runs.
 """
 
+import os
 import sys
 
-from .mssql_tool import main as tool_main
 
-if __name__ == "__main__":
-    sys.exit(tool_main())
+def main() -> int:
+    """Dispatch to the directory monitor or the CLI tool."""
+    mode = os.environ.get("TOOL_MODE", "monitor").lower()
+
+    if mode == "cli":
+        from .mssql_tool import main as tool_main
+
+        return tool_main()
 
+    from .monitor import main as monitor_main
+
+    return monitor_main()
+
+
+if __name__ == "__main__":
+    sys.exit(main())
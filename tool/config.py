@@ -4,14 +4,119 @@ Configuration settings for the MSSQL backup tool.
 This module defines all configuration settings using Pydantic classes.
 """
 
-from typing import List
+import atexit
+import hashlib
+import json
+import logging
+import logging.handlers
+import os
+import queue
+import re
+from functools import cached_property, lru_cache
+from types import MappingProxyType
+from typing import Any, List, Mapping, Optional, Tuple
 
-from dotenv import load_dotenv
-from pydantic import Field, SecretStr
+from pydantic import AliasChoices, Field, SecretStr, field_validator
 from pydantic_settings import BaseSettings, SettingsConfigDict
 
-# Load environment variables
-load_dotenv()
+from .fsutil import ensure_dir
+
+try:
+    import orjson
+except ImportError:  # pragma: no cover - fall back to the stdlib encoder
+    orjson = None
+
+# Queue connecting application loggers to the background log listener.
+# Loggers only enqueue records; formatting and file I/O happen on the
+# listener thread (see start_log_listener).
+_log_queue: "queue.SimpleQueue" = queue.SimpleQueue()
+_log_listener: Optional[logging.handlers.QueueListener] = None
+
+
+def _load_env(path: str = ".env") -> None:
+    """Populate os.environ from a .env file (single pass, stdlib only).
+
+    Replaces python-dotenv: one open() and one pass over the lines, with
+    variables already present in the environment taking precedence. The
+    settings classes below then read everything from os.environ, so the
+    file is parsed exactly once per process instead of once per class.
+    """
+    with open(path, "r", encoding="utf-8") as f:
+        for line in f:
+            line = line.strip()
+            if not line or line.startswith("#") or "=" not in line:
+                continue
+            key, _, value = line.partition("=")
+            os.environ.setdefault(key.strip(), value.strip().strip("'\""))
+
+
+if os.path.isfile(".env"):
+    _load_env()
+
+
+class OrjsonFormatter(logging.Formatter):
+    """JSON log formatter backed by orjson's C serializer.
+
+    orjson emits UTF-8 directly and escapes strings in C, avoiding the
+    per-field Python work of pythonjsonlogger/stdlib json on every record.
+    """
+
+    def format(self, record: logging.LogRecord) -> str:
+        payload = {
+            "asctime": self.formatTime(record),
+            "levelname": record.levelname,
+            "name": record.name,
+            "message": record.getMessage(),
+        }
+        if record.exc_info:
+            payload["exc_info"] = self.formatException(record.exc_info)
+
+        if orjson is not None:
+            return orjson.dumps(payload).decode()
+        return json.dumps(payload)
+
+
+class SizeGatedTimedRotatingFileHandler(logging.handlers.TimedRotatingFileHandler):
+    """Timed rotation that also rolls over once the file exceeds maxBytes.
+
+    Rollover renames the current file once (to a timestamped name) and
+    opens a fresh one, unlike RotatingFileHandler which cascades up to
+    backupCount renames on every rollover.
+    """
+
+    def __init__(self, filename, maxBytes: int = 0, **kwargs):
+        super().__init__(filename, **kwargs)
+        self.maxBytes = maxBytes
+        # Rollover names need second resolution: the when="midnight"
+        # default suffix is day-granular and doRollover deletes an
+        # existing destination, so a second size-triggered rollover on
+        # the same day would overwrite the first. extMatch must track
+        # the suffix for backupCount pruning to keep working.
+        self.suffix = "%Y%m%d-%H%M%S"
+        self.extMatch = re.compile(r"^\d{8}-\d{6}(\.\w+)?$", re.ASCII)
+
+    def rotation_filename(self, default_name: str) -> str:
+        # doRollover stamps rolled files with the *start* of the elapsed
+        # interval, so size-triggered rollovers within one interval all
+        # produce the same name - and doRollover deletes an existing
+        # destination before renaming. Uniquify instead of overwriting;
+        # the numeric tail still matches extMatch for backupCount pruning.
+        name = super().rotation_filename(default_name)
+        if not os.path.exists(name):
+            return name
+        i = 1
+        while os.path.exists(f"{name}.{i}"):
+            i += 1
+        return f"{name}.{i}"
+
+    def shouldRollover(self, record: logging.LogRecord) -> bool:
+        if super().shouldRollover(record):
+            return True
+        if self.maxBytes > 0 and self.stream is not None:
+            msg = f"{self.format(record)}\n"
+            if self.stream.tell() + len(msg) >= self.maxBytes:
+                return True
+        return False
 
 
 class MSSQLSettings(BaseSettings):
@@ -24,18 +129,31 @@ class MSSQLSettings(BaseSettings):
     timeout: int = Field(default=60, description="Connection timeout in seconds")
 
     model_config = SettingsConfigDict(
-        env_prefix="MSSQL_", extra="ignore", env_file=".env"
+        env_prefix="MSSQL_", extra="ignore", frozen=True
     )
 
-    def get_connection_dict(self) -> dict:
-        """Get connection parameters as a dictionary."""
-        return {
-            "server": self.server,
-            "port": self.port,
-            "user": self.user,
-            "password": self.password.get_secret_value(),
-            "timeout": self.timeout,
-        }
+    @cached_property
+    def connection_dict(self) -> Mapping[str, Any]:
+        """Connection parameters as a read-only mapping, resolved once.
+
+        Credentials are immutable for the process lifetime, so the SecretStr
+        unwrapping and dict construction only happen on first access. The
+        MappingProxyType view prevents callers from mutating the shared copy
+        (and keeps the plaintext password confined to this one object).
+        """
+        return MappingProxyType(
+            {
+                "server": self.server,
+                "port": self.port,
+                "user": self.user,
+                "password": self.password.get_secret_value(),
+                "timeout": self.timeout,
+            }
+        )
+
+    def get_connection_dict(self) -> Mapping[str, Any]:
+        """Get connection parameters as a read-only mapping (cached)."""
+        return self.connection_dict
 
 
 class BackupSettings(BaseSettings):
@@ -57,31 +175,52 @@ class BackupSettings(BaseSettings):
     retry_delay: int = Field(
         default=5, description="Delay between retry attempts in seconds"
     )
+    extract_workers: int = Field(
+        default_factory=lambda: os.cpu_count() or 4,
+        description="Maximum number of archives to extract/process in parallel",
+    )
 
     model_config = SettingsConfigDict(
-        env_prefix="BACKUP_", extra="ignore", env_file=".env"
+        env_prefix="BACKUP_", extra="ignore", frozen=True
     )
 
+    @cached_property
+    def pattern_suffixes(self) -> Tuple[str, ...]:
+        """File patterns as a lowercased tuple, usable with str.endswith."""
+        return tuple(p.lower() for p in self.file_patterns)
+
 
 class LoggingSettings(BaseSettings):
     """Logging configuration settings."""
 
-    level: str = Field(default="INFO", description="Logging level")
+    # APP_LOG_LEVEL is the name docker-compose and the README use; keep
+    # honoring it alongside the prefixed form (LOG_LEVEL wins if both set)
+    level: str = Field(
+        default="INFO",
+        description="Logging level",
+        validation_alias=AliasChoices("LOG_LEVEL", "APP_LOG_LEVEL"),
+    )
     directory: str = Field(default="logs", description="Log directory")
     max_size_mb: int = Field(default=10, description="Max log file size in MB")
     backup_count: int = Field(default=5, description="Number of log backups to keep")
     json_format: bool = Field(default=True, description="Use JSON formatted logs")
+    enable_file: bool = Field(
+        default=True,
+        description="Write logs to a rotating file in addition to the console",
+    )
 
     model_config = SettingsConfigDict(
-        env_prefix="LOG_", extra="ignore", env_file=".env"
+        env_prefix="LOG_", extra="ignore", frozen=True
     )
 
-    def validate_log_level(self) -> str:
-        """Validate that the log level is one of the supported values."""
+    @field_validator("level", mode="after")
+    @classmethod
+    def validate_log_level(cls, v: str) -> str:
+        """Validate and normalize the log level at construction time."""
         allowed_levels = ["DEBUG", "INFO", "WARNING", "ERROR", "CRITICAL"]
-        if self.level.upper() not in allowed_levels:
+        if v.upper() not in allowed_levels:
             raise ValueError(f"Log level must be one of: {', '.join(allowed_levels)}")
-        return self.level.upper()
+        return v.upper()
 
 
 class AppSettings(BaseSettings):
@@ -94,6 +233,16 @@ class AppSettings(BaseSettings):
     polling_interval: float = Field(
         default=1.0, description="Polling interval in seconds"
     )
+    use_polling: bool = Field(
+        default=False,
+        description="Poll the watch directory instead of using filesystem "
+        "events (for filesystems where inotify is unreliable, e.g. NFS/SMB)",
+    )
+    pin_monitor_cpu: bool = Field(
+        default=False,
+        description="Pin the monitor process to a single CPU core and raise "
+        "its scheduling priority (Linux only, best effort)",
+    )
 
     # Component settings
     mssql: MSSQLSettings = Field(default_factory=MSSQLSettings)
@@ -101,46 +250,181 @@ class AppSettings(BaseSettings):
     logging: LoggingSettings = Field(default_factory=LoggingSettings)
 
     model_config = SettingsConfigDict(
-        env_file=".env", env_file_encoding="utf-8", extra="ignore"
+        extra="ignore", frozen=True
     )
 
-    def get_logging_config(self) -> dict:
-        """Get logging configuration dictionary."""
+    @cached_property
+    def logging_config(self) -> dict:
+        """Logging configuration dictionary, built once.
+
+        The root logger only gets a QueueHandler; the actual console and
+        file handlers run on the listener thread started by
+        start_log_listener(), keeping log I/O off the calling thread.
+        """
         return {
             "version": 1,
             "disable_existing_loggers": False,
-            "formatters": {
-                "standard": {
-                    "format": "%(asctime)s [%(levelname)s] %(name)s: %(message)s"
-                },
-                "json": {
-                    "()": "pythonjsonlogger.jsonlogger.JsonFormatter",
-                    "format": "%(asctime)s %(levelname)s %(name)s %(message)s",
-                },
-            },
             "handlers": {
-                "console": {
-                    "class": "logging.StreamHandler",
-                    "formatter": "standard",
-                    "level": self.logging.validate_log_level(),
-                },
-                "file": {
-                    "class": "logging.handlers.RotatingFileHandler",
-                    "filename": f"{self.logging.directory}/tool.log",
-                    "maxBytes": self.logging.max_size_mb * 1024 * 1024,
-                    "backupCount": self.logging.backup_count,
-                    "formatter": "json" if self.logging.json_format else "standard",
-                    "level": self.logging.validate_log_level(),
+                "queue": {
+                    "class": "logging.handlers.QueueHandler",
+                    "queue": _log_queue,
                 },
             },
             "loggers": {
                 "": {
-                    "handlers": ["console", "file"],
-                    "level": self.logging.validate_log_level(),
+                    "handlers": ["queue"],
+                    # Numeric level so emission checks skip the name lookup
+                    "level": logging.getLevelName(self.logging.level),
                 }
             },
         }
 
+    def get_logging_config(self) -> dict:
+        """Get the logging configuration dictionary (cached)."""
+        return self.logging_config
+
+
+# Environment prefixes that feed into the settings classes above
+_ENV_PREFIXES = ("MSSQL_", "BACKUP_", "LOG_")
+
+# AppSettings' own fields read unprefixed variables; they must invalidate
+# the cache just like the prefixed ones
+_ENV_NAMES = frozenset(
+    {
+        "WATCH_DIR",
+        "POLLING_INTERVAL",
+        "USE_POLLING",
+        "PIN_MONITOR_CPU",
+        "APP_LOG_LEVEL",
+    }
+)
+_CACHE_DIR = os.path.join(os.path.expanduser("~"), ".cache", "mssql-restore")
+
+
+def _settings_fingerprint() -> str:
+    """Hash the inputs that determine settings: .env mtime and env vars."""
+    try:
+        env_mtime = os.stat(".env").st_mtime_ns
+    except OSError:
+        env_mtime = 0
+
+    # The password never enters the fingerprint: the cached copy is
+    # re-populated from the live environment on every load, so its value
+    # contributes nothing to invalidation - and hashing it would leak a
+    # dictionary-attackable digest into a world-readable filename.
+    relevant = tuple(
+        sorted(
+            (k, v)
+            for k, v in os.environ.items()
+            if (k.startswith(_ENV_PREFIXES) or k in _ENV_NAMES)
+            and k != "MSSQL_PASSWORD"
+        )
+    )
+    return hashlib.blake2b(
+        repr((env_mtime, relevant)).encode(), digest_size=16
+    ).hexdigest()
+
+
+def _load_settings() -> AppSettings:
+    """Build AppSettings, short-circuiting env parsing via a disk cache.
+
+    Re-parsing .env and running all validators costs tens of ms on every
+    startup even though the config rarely changes. The resolved settings
+    are cached as JSON keyed by a fingerprint of .env and the relevant
+    environment variables. The MSSQL password is never written to the
+    cache; the cache is only used when the password is available from the
+    environment, and the cached copy is re-populated from there.
+    """
+    if "MSSQL_PASSWORD" in os.environ:
+        cache_path = os.path.join(
+            _CACHE_DIR, f"settings-{_settings_fingerprint()}.json"
+        )
+        try:
+            with open(cache_path, "r", encoding="utf-8") as f:
+                cached = json.load(f)
+            cached["mssql"]["password"] = os.environ["MSSQL_PASSWORD"]
+            return AppSettings.model_validate(cached)
+        except (OSError, ValueError, KeyError):
+            pass
+
+        app_settings = AppSettings()
+
+        try:
+            data = app_settings.model_dump(mode="json")
+            data["mssql"].pop("password", None)
+            # Private to the owning user; the cache names and contents
+            # describe this deployment's configuration
+            os.makedirs(_CACHE_DIR, mode=0o700, exist_ok=True)
+            with open(cache_path, "w", encoding="utf-8") as f:
+                json.dump(data, f)
+        except OSError:
+            pass
+        return app_settings
+
+    return AppSettings()
+
+
+@lru_cache(maxsize=1)
+def get_settings() -> AppSettings:
+    """Return the process-wide settings, constructed at most once.
+
+    Callers that want to defer settings construction (and its env/cache
+    work) past import time should use this instead of the module-level
+    instance below.
+    """
+    return _load_settings()
+
 
 # Create global settings instance
-settings = AppSettings()
+settings = get_settings()
+
+
+def start_log_listener() -> logging.handlers.QueueListener:
+    """Start the background listener that drains log records to handlers.
+
+    Idempotent; the listener is stopped automatically at interpreter exit.
+    """
+    global _log_listener
+    if _log_listener is not None:
+        return _log_listener
+
+    level = logging.getLevelName(settings.logging.level)
+    standard = logging.Formatter("%(asctime)s [%(levelname)s] %(name)s: %(message)s")
+
+    console = logging.StreamHandler()
+    console.setFormatter(standard)
+    console.setLevel(level)
+    handlers = [console]
+
+    # Containerized deployments that only collect stdout can skip the file
+    # handler entirely - one less handler per drained record
+    if settings.logging.enable_file:
+        ensure_dir(settings.logging.directory)
+        file_handler = SizeGatedTimedRotatingFileHandler(
+            f"{settings.logging.directory}/tool.log",
+            maxBytes=settings.logging.max_size_mb * 1024 * 1024,
+            when="midnight",
+            backupCount=settings.logging.backup_count,
+            utc=True,
+        )
+        if settings.logging.json_format:
+            file_handler.setFormatter(OrjsonFormatter())
+        else:
+            file_handler.setFormatter(standard)
+        file_handler.setLevel(level)
+        handlers.append(file_handler)
+
+    _log_listener = logging.handlers.QueueListener(
+        _log_queue, *handlers, respect_handler_level=True
+    )
+    _log_listener.start()
+    atexit.register(stop_log_listener)
+    return _log_listener
+
+
+def stop_log_listener() -> None:
+    """Stop the background log listener, flushing queued records."""
+    global _log_listener
+    if _log_listener is not None:
+        _log_listener.stop()
+        _log_listener = None
@@ -0,0 +1,113 @@
+"""
+Filesystem helpers for the MSSQL Backup Tool.
+
+Small wrappers around os-level operations shared by the monitor,
+processor and resolver.
+"""
+
+import os
+import shutil
+
+# 4 MiB copy buffer: large enough to amortize per-syscall overhead on
+# GB-scale backup files (the stdlib default is 64 KiB)
+COPY_BUFSIZE = 4 * 1024 * 1024
+
+# Raise the stdlib buffer too, so shutil-based copies that remain (e.g.
+# shutil.move falling back to a cross-device copy) get the same treatment
+if hasattr(shutil, "COPY_BUFSIZE"):
+    shutil.COPY_BUFSIZE = COPY_BUFSIZE
+
+
+def ensure_dir(path: str) -> None:
+    """
+    Create a directory if it does not already exist.
+
+    os.makedirs(exist_ok=True) always issues the mkdir syscall and relies
+    on it failing with EEXIST; in the common case the directory already
+    exists, so a stat-first check does the job with a single cheap syscall.
+
+    Args:
+        path: Directory path to create
+    """
+    try:
+        os.stat(path)
+    except FileNotFoundError:
+        os.makedirs(path, exist_ok=True)
+
+
+def fast_copy(src: str, dst: str) -> None:
+    """
+    Copy a file without bouncing its bytes through user space.
+
+    Tries os.copy_file_range (in-kernel copy, CoW reflink on supporting
+    filesystems), then os.sendfile, then falls back to a buffered
+    user-space copy. Metadata is preserved as with shutil.copy2.
+
+    Args:
+        src: Source file path
+        dst: Destination file path
+
+    Raises:
+        IOError: For copy errors
+    """
+    size = os.stat(src).st_size
+    cloexec = getattr(os, "O_CLOEXEC", 0)
+
+    src_fd = os.open(src, os.O_RDONLY | cloexec)
+    try:
+        dst_fd = os.open(dst, os.O_WRONLY | os.O_CREAT | os.O_TRUNC | cloexec, 0o644)
+        try:
+            if not _copy_in_kernel(src_fd, dst_fd, size):
+                with os.fdopen(os.dup(src_fd), "rb") as fsrc:
+                    with os.fdopen(os.dup(dst_fd), "wb") as fdst:
+                        shutil.copyfileobj(fsrc, fdst, COPY_BUFSIZE)
+        finally:
+            os.close(dst_fd)
+    finally:
+        os.close(src_fd)
+
+    shutil.copystat(src, dst)
+
+
+def _copy_in_kernel(src_fd: int, dst_fd: int, size: int) -> bool:
+    """Try the in-kernel copy mechanisms; False if none completed."""
+    for copier in (_copy_range, _copy_sendfile):
+        try:
+            if copier(src_fd, dst_fd, size):
+                return True
+        except OSError:
+            # EXDEV/EINVAL/ENOSYS etc. depending on kernel and filesystem;
+            # rewind and let the next strategy start from scratch
+            pass
+        os.lseek(src_fd, 0, os.SEEK_SET)
+        os.lseek(dst_fd, 0, os.SEEK_SET)
+        os.ftruncate(dst_fd, 0)
+    return False
+
+
+def _copy_range(src_fd: int, dst_fd: int, size: int) -> bool:
+    """Copy via copy_file_range; False if unsupported or incomplete."""
+    if not hasattr(os, "copy_file_range"):
+        return False
+
+    remaining = size
+    while remaining > 0:
+        copied = os.copy_file_range(src_fd, dst_fd, remaining)
+        if copied == 0:
+            return False
+        remaining -= copied
+    return True
+
+
+def _copy_sendfile(src_fd: int, dst_fd: int, size: int) -> bool:
+    """Copy via sendfile; False if unsupported or incomplete."""
+    if not hasattr(os, "sendfile"):
+        return False
+
+    offset = 0
+    while offset < size:
+        sent = os.sendfile(dst_fd, src_fd, offset, size - offset)
+        if sent == 0:
+            return False
+        offset += sent
+    return True
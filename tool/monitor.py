@@ -5,23 +5,118 @@ This script continuously monitors a directory for new backup files
 and processes them using the backup processor.
 """
 
+import hashlib
 import json
 import logging
+import logging.config
 import os
+import queue
+import signal
 import sys
-import time
-from typing import Dict, List, Set
+import threading
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+from typing import Dict, List, Optional, Set, Tuple
 
-from .backup_processor import BackupProcessor
-from .config import settings
+from watchdog.events import PatternMatchingEventHandler
+from watchdog.observers import Observer
 
-# Configure logging
-logging.basicConfig(
-    level=getattr(logging, os.environ.get("APP_LOG_LEVEL", "INFO")),
-    format="%(asctime)s [%(levelname)s] %(name)s: %(message)s",
-)
+from . import __version__
+from .backup_processor import BackupProcessor
+from .config import settings, start_log_listener
+from .fsutil import ensure_dir
+
+try:
+    import orjson
+except ImportError:  # pragma: no cover - fall back to the stdlib encoder
+    orjson = None
+
+# Configure logging: workers only enqueue records; formatting and disk
+# I/O happen on the listener thread, not under the processing threads
+logging.config.dictConfig(settings.get_logging_config())
+start_log_listener()
 logger = logging.getLogger(__name__)
 
+# stdout is block-buffered when piped; line buffering delivers each JSON
+# progress line as it is written without an explicit flush per message
+try:
+    sys.stdout.reconfigure(line_buffering=True)
+except (AttributeError, ValueError):
+    pass
+
+# Suffixes used by uploaders for in-progress transfers; never worth
+# dispatching. Compiled once so endswith gets the tuple fast path.
+_SKIP_SUFFIXES = (".lock", ".tmp", ".part")
+
+# Bound on the dispatched-file identity LRU (see BackupMonitor._submit)
+_DISPATCHED_LRU_MAX = 4096
+
+# Bound on the processed-file name set; long-running monitors would
+# otherwise grow it for every file ever restored
+_PROCESSED_LRU_MAX = 10_000
+
+
+def _name_fingerprint(name: str) -> int:
+    """64-bit fingerprint of a filename for the processed-files set.
+
+    Small ints hash and store far cheaper than the filename strings they
+    replace; at this digest size collisions are negligible for the
+    volume of files a monitor sees.
+    """
+    return int.from_bytes(
+        hashlib.blake2b(name.encode(), digest_size=8).digest(), "big"
+    )
+
+
+class BackupFileHandler(PatternMatchingEventHandler):
+    """Forwards filesystem events for backup files onto a processing queue."""
+
+    def __init__(
+        self, file_patterns: Tuple[str, ...], file_queue: "queue.SimpleQueue"
+    ):
+        """
+        Initialize the handler.
+
+        Args:
+            file_patterns: File extensions to watch for
+            file_queue: Queue that receives matching file paths
+        """
+        # watchdog filters events against these globs before dispatch, so
+        # non-matching events (the bulk of a chatty directory) never reach
+        # the per-event handlers below
+        super().__init__(
+            patterns=[f"*{p}" for p in file_patterns],
+            ignore_patterns=[f"*{s}" for s in _SKIP_SUFFIXES],
+            ignore_directories=True,
+            case_sensitive=False,
+        )
+        self.file_patterns = file_patterns
+        self.file_queue = file_queue
+        # The Linux inotify backend delivers IN_CLOSE_WRITE as a close
+        # event; reacting to that instead of creation avoids dispatching
+        # files that are still being written.
+        self._have_close_events = sys.platform.startswith("linux")
+
+    def on_created(self, event) -> None:
+        """Handle a file creation event (non-Linux fallback)."""
+        if not self._have_close_events:
+            self.file_queue.put(event.src_path)
+
+    def on_closed(self, event) -> None:
+        """Handle a file being closed after writing."""
+        self.file_queue.put(event.src_path)
+
+    def on_moved(self, event) -> None:
+        """Handle a file move/rename into the watch directory.
+
+        A move dispatches when either endpoint matches, so check that it is
+        the destination that carries the backup extension (and not an
+        in-progress suffix). The path is lowercased once for both checks.
+        """
+        lower = event.dest_path.lower()
+        if lower.endswith(self.file_patterns) and not lower.endswith(_SKIP_SUFFIXES):
+            self.file_queue.put(event.dest_path)
+
 
 class BackupMonitor:
     """Monitors a directory for backup files and processes them."""
@@ -41,50 +136,63 @@ class BackupMonitor:
             polling_interval: Time between checks in seconds
         """
         self.watch_dir = watch_dir or settings.watch_dir
-        self.file_patterns = file_patterns or settings.backup.file_patterns
+        self.file_patterns = (
+            tuple(p.lower() for p in file_patterns)
+            if file_patterns
+            else settings.backup.pattern_suffixes
+        )
         self.polling_interval = polling_interval or settings.polling_interval
-        if hasattr(settings.mssql, "get_connection_params"):
-            mssql_settings_dict = settings.mssql.get_connection_params()
-            mssql_settings_dict.update(
-                {
-                    "retry_attempts": settings.backup.retry_attempts,
-                    "retry_delay": settings.backup.retry_delay,
-                }
-            )
-        elif hasattr(settings.mssql, "model_dump"):
-            mssql_settings_dict = settings.mssql.model_dump()
-            mssql_settings_dict.update(
-                {
-                    "retry_attempts": settings.backup.retry_attempts,
-                    "retry_delay": settings.backup.retry_delay,
-                }
-            )
-        else:
-            # Manual conversion
-            mssql_settings_dict = {
-                "server": settings.mssql.server,
-                "port": settings.mssql.port,
-                "user": settings.mssql.user,
-                "password": settings.mssql.password.get_secret_value(),
-                "timeout": settings.mssql.timeout,
-                "retry_attempts": settings.backup.retry_attempts,
-                "retry_delay": settings.backup.retry_delay,
-            }
+
+        # Spread the cached connection mapping into a fresh dict so the
+        # shared settings copy is never mutated
+        mssql_settings_dict = {
+            **settings.mssql.connection_dict,
+            "retry_attempts": settings.backup.retry_attempts,
+            "retry_delay": settings.backup.retry_delay,
+        }
 
         self.processor = BackupProcessor(
             mssql_settings=mssql_settings_dict,
             shared_backup_dir=settings.backup.shared_dir,
             progress_callback=self._progress_callback,
         )
-        self.processed_files: Set[str] = set()
+        # Insertion-ordered so the oldest entries can be evicted once the
+        # cap is hit; keys are filename fingerprints, not the names
+        # themselves (see _name_fingerprint)
+        self.processed_files: "OrderedDict[int, None]" = OrderedDict()
+        self._stop_event = threading.Event()
+        # SimpleQueue: its put is reentrant, so stop() can enqueue the
+        # shutdown sentinel from a signal handler even when the signal
+        # lands while the main thread is inside get()
+        self._file_queue: "queue.SimpleQueue" = queue.SimpleQueue()
+        self._bg_thread: Optional[threading.Thread] = None
+
+        # Worker pool so a large restore doesn't block detection and
+        # processing of subsequent files; bounded by extract_workers
+        self._executor = ThreadPoolExecutor(
+            max_workers=settings.backup.extract_workers,
+            thread_name_prefix="backup-worker",
+        )
+        self._in_flight: Set[str] = set()
+        self._in_flight_lock = threading.Lock()
+
+        # Identity of files already handed to the pool, keyed by stat
+        # identity rather than name: the initial scan and the observer can
+        # race to report the same file, and a re-uploaded file (new inode
+        # or mtime) must still be picked up. LRU-bounded.
+        self._dispatched: "OrderedDict[Tuple, None]" = OrderedDict()
+
+        # Scan candidates awaiting a stable size/mtime, name -> signature
+        # from the previous scan (see _find_backup_files)
+        self._pending: Dict[str, Tuple[int, int]] = {}
 
         # Ensure watch directory exists
-        if not os.path.exists(self.watch_dir):
-            os.makedirs(self.watch_dir, exist_ok=True)
+        ensure_dir(self.watch_dir)
 
         logger.info(
-            f"Starting backup monitor watching {self.watch_dir} "
-            f"for patterns {self.file_patterns}"
+            "Starting backup monitor watching %s for patterns %s",
+            self.watch_dir,
+            self.file_patterns,
         )
 
     def _progress_callback(self, status: str, message: str, data: Dict) -> None:
@@ -94,37 +202,61 @@ class BackupMonitor:
             "message": message,
             "data": data,
         }
-        logger.info(f"Processing update: {message}")
-
-        # Print to stdout as JSON for potential consumers
-        print(json.dumps(output), flush=True)
+        logger.info("Processing update: %s", message)
+
+        # Print to stdout as JSON for potential consumers; orjson
+        # serializes in C when available. No flush per message - the
+        # write goes through the text layer, whose line buffering (set
+        # up at module load) delivers each newline-terminated record;
+        # writing the bytes to sys.stdout.buffer directly would bypass
+        # that and sit in the block buffer.
+        if orjson is not None:
+            sys.stdout.write(
+                orjson.dumps(output, option=orjson.OPT_APPEND_NEWLINE).decode()
+            )
+        else:
+            sys.stdout.write(json.dumps(output) + "\n")
 
     def _find_backup_files(self) -> List[str]:
         """
         Find backup files in the watch directory.
 
+        A file only qualifies once its size and mtime match what the
+        previous scan recorded - a file still being uploaded would fail
+        the restore and burn a retry cycle.
+
         Returns:
             List[str]: List of file paths
         """
         if not os.path.exists(self.watch_dir):
-            logger.warning(f"Watch directory does not exist: {self.watch_dir}")
+            logger.warning("Watch directory does not exist: %s", self.watch_dir)
             return []
 
         files = []
-        for filename in os.listdir(self.watch_dir):
-            # Skip files we've already processed
-            if filename in self.processed_files:
-                continue
-
-            # Skip files that don't match our patterns
-            if not any(filename.lower().endswith(ext) for ext in self.file_patterns):
-                continue
-
-            file_path = os.path.join(self.watch_dir, filename)
-
-            # Only include files (not directories)
-            if os.path.isfile(file_path):
-                files.append(file_path)
+        with os.scandir(self.watch_dir) as entries:
+            for entry in entries:
+                # Skip files we've already processed
+                if _name_fingerprint(entry.name) in self.processed_files:
+                    continue
+
+                # Skip files that don't match our patterns
+                if not entry.name.lower().endswith(self.file_patterns):
+                    continue
+
+                # Only include files (not directories); is_file() reuses the
+                # directory entry type, avoiding a stat syscall per entry
+                if not entry.is_file(follow_symlinks=False):
+                    continue
+
+                st = entry.stat(follow_symlinks=False)
+                signature = (st.st_size, st.st_mtime_ns)
+                if self._pending.get(entry.name) == signature:
+                    del self._pending[entry.name]
+                    files.append(entry.path)
+                else:
+                    # First sighting, or still growing; check again on
+                    # the next scan
+                    self._pending[entry.name] = signature
 
         return files
 
@@ -139,7 +271,7 @@ class BackupMonitor:
             bool: True if processing succeeded, False otherwise
         """
         filename = os.path.basename(file_path)
-        logger.info(f"Processing new backup file: {filename}")
+        logger.info("Processing new backup file: %s", filename)
 
         try:
             result = self.processor.process_backup(
@@ -147,43 +279,209 @@ class BackupMonitor:
                 archive_processed=settings.backup.archive_processed,
             )
 
-            logger.info(f"Successfully restored database: {result['database_name']}")
-            self.processed_files.add(filename)
+            logger.info("Successfully restored database: %s", result["database_name"])
+            self._remember_processed(filename)
             return True
 
         except Exception as e:
-            logger.error(f"Failed to process backup file {filename}: {str(e)}")
+            logger.error("Failed to process backup file %s: %s", filename, e)
             # Don't add to processed_files so we can retry
             return False
 
-    def run(self) -> None:
-        """Run the monitor continuously."""
-        logger.info(f"Monitoring {self.watch_dir} for backup files")
+    def _remember_processed(self, filename: str) -> None:
+        """Record a successfully processed file, evicting the oldest."""
+        self.processed_files[_name_fingerprint(filename)] = None
+        if len(self.processed_files) > _PROCESSED_LRU_MAX:
+            self.processed_files.popitem(last=False)
 
+    def _log_watch_dir_summary(self) -> None:
+        """Log a count and short preview of the watch directory contents.
+
+        Streams the directory instead of materializing a full listing;
+        only the first 10 names are ever held, and %-style formatting
+        defers the string work until the record is actually emitted.
+        """
         try:
-            while True:
-                files = self._find_backup_files()
+            with os.scandir(self.watch_dir) as entries:
+                preview = []
+                total = 0
+                for entry in entries:
+                    total += 1
+                    if len(preview) < 10:
+                        preview.append(entry.name)
+        except OSError:
+            return
+
+        logger.info("Found %d files in watch directory", total)
+        if preview:
+            logger.info(
+                "First %d files: %s%s",
+                len(preview),
+                preview,
+                "..." if total > 10 else "",
+            )
 
-                for file_path in files:
-                    self.process_file(file_path)
+    def run(self) -> None:
+        """Run the monitor continuously."""
+        logger.info("Monitoring %s for backup files", self.watch_dir)
+        self._log_watch_dir_summary()
 
-                time.sleep(self.polling_interval)
+        try:
+            if settings.use_polling:
+                self._run_polling()
+            else:
+                self._run_events()
 
         except KeyboardInterrupt:
             logger.info("Monitoring stopped by user")
         except Exception as e:
-            logger.error(f"Monitoring stopped due to error: {str(e)}")
+            logger.error("Monitoring stopped due to error: %s", e)
             raise
+        finally:
+            self._executor.shutdown(wait=True)
+            self.processor.close()
+
+    def start_background(self) -> None:
+        """Run the monitor on a background thread and return immediately.
+
+        Lets the monitor coexist with other work in the same process (an
+        API server, for instance). Pair with stop() and join(); signal
+        handlers stay with the caller, who owns the main thread.
+        """
+        self._bg_thread = threading.Thread(
+            target=self.run, name="backup-monitor", daemon=True
+        )
+        self._bg_thread.start()
+
+    def join(self, timeout: Optional[float] = None) -> None:
+        """Wait for the background monitor thread to finish."""
+        if self._bg_thread is not None:
+            self._bg_thread.join(timeout)
+
+    def stop(self) -> None:
+        """Request shutdown; safe to call from a signal handler.
+
+        Only sets the stop flag and unblocks the event queue - no real
+        work happens in signal context.
+        """
+        self._stop_event.set()
+        self._file_queue.put(None)
+
+    def _submit(self, file_path: str) -> None:
+        """Hand a file to the worker pool, skipping duplicates in flight."""
+        filename = os.path.basename(file_path)
+        try:
+            st = os.stat(file_path)
+        except OSError:
+            # Vanished between detection and submission
+            return
+        key = (st.st_dev, st.st_ino, st.st_mtime_ns, st.st_size)
+
+        with self._in_flight_lock:
+            if (
+                filename in self._in_flight
+                or _name_fingerprint(filename) in self.processed_files
+            ):
+                return
+            if key in self._dispatched:
+                self._dispatched.move_to_end(key)
+                return
+            self._in_flight.add(filename)
+            self._dispatched[key] = None
+            if len(self._dispatched) > _DISPATCHED_LRU_MAX:
+                self._dispatched.popitem(last=False)
+
+        future = self._executor.submit(self.process_file, file_path)
+        future.add_done_callback(lambda f: self._mark_done(filename, key, f))
+
+    def _mark_done(self, filename: str, key: Tuple, future) -> None:
+        """Drop a finished file from the in-flight set."""
+        with self._in_flight_lock:
+            self._in_flight.discard(filename)
+            # Failed files stay eligible for a later retry
+            if future.exception() is not None or not future.result():
+                self._dispatched.pop(key, None)
+
+    def _run_polling(self) -> None:
+        """Poll the watch directory on a fixed interval (fallback mode).
+
+        The pause between scans waits on the stop event rather than
+        sleeping, so stop() interrupts it immediately instead of being
+        noticed up to polling_interval seconds later.
+        """
+        while not self._stop_event.is_set():
+            files = self._find_backup_files()
+
+            for file_path in files:
+                self._submit(file_path)
+
+            self._stop_event.wait(self.polling_interval)
+
+    def _run_events(self) -> None:
+        """Process backup files as the kernel reports them (default mode)."""
+        handler = BackupFileHandler(self.file_patterns, self._file_queue)
+
+        observer = Observer()
+        observer.schedule(handler, self.watch_dir, recursive=False)
+        observer.start()
+
+        try:
+            # Pick up files that were already present before the observer
+            # started; events only cover files arriving afterwards. Two
+            # scans a beat apart, so the stability check can pass for
+            # files that are no longer changing.
+            for file_path in self._find_backup_files():
+                self._submit(file_path)
+            if self._pending and not self._stop_event.wait(self.polling_interval):
+                for file_path in self._find_backup_files():
+                    self._submit(file_path)
+
+            while not self._stop_event.is_set():
+                file_path = self._file_queue.get()
+                if file_path is None:
+                    break
+                self._submit(file_path)
+
+        finally:
+            observer.stop()
+            observer.join()
+
+
+def _pin_to_dedicated_cpu() -> None:
+    """Best effort: pin the monitor to one core and raise its priority.
+
+    Keeps the watch loop cache-warm on a single core so it wakes promptly
+    for events. Child processes (e.g. unrar) inherit the affinity mask,
+    which is why this is opt-in. Silently skipped where unsupported.
+    """
+    try:
+        cpus = os.sched_getaffinity(0)
+        if len(cpus) > 1:
+            os.sched_setaffinity(0, {min(cpus)})
+        os.nice(-5)
+    except (AttributeError, OSError):
+        logger.debug("CPU pinning unavailable; continuing unpinned")
 
 
 def main() -> int:
     """Main entry point for the monitor service."""
     try:
+        logger.info("MSSQL backup monitor %s starting", __version__)
+
+        if settings.pin_monitor_cpu:
+            _pin_to_dedicated_cpu()
+
         monitor = BackupMonitor()
+
+        # docker stop sends SIGTERM; without a handler the process would be
+        # killed mid-restore. Both signals funnel into the same stop path.
+        for sig in (signal.SIGINT, signal.SIGTERM):
+            signal.signal(sig, lambda *_: monitor.stop())
+
         monitor.run()
         return 0
     except Exception as e:
-        logger.exception(f"Unhandled exception: {str(e)}")
+        logger.exception("Unhandled exception: %s", e)
         return 1
 
 
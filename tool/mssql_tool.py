@@ -7,36 +7,104 @@ producing structured output via STDOUT, making it composable with other tools.
 
 import json
 import logging
+import logging.config
 import sys
+import time
 from datetime import datetime, timezone
-from typing import Any, Dict, Optional
+from typing import Any, Dict, Optional, Tuple
 
 from .backup_processor import BackupProcessor
-from .config import settings
+from .config import settings, start_log_listener
 from .resource_resolver import ResourceResolver
 
-# Configure logging to file, not stdout (to avoid interfering with JSON output)
-logging.basicConfig(**settings.get_logging_config())
+try:
+    import orjson
+except ImportError:  # pragma: no cover - fall back to the stdlib encoder
+    orjson = None
+
 logger = logging.getLogger(__name__)
 
 
+def _configure_logging() -> None:
+    """Apply the shared logging config once, at first real use.
+
+    Logging goes to a file, not stdout (to avoid interfering with the
+    JSON output). Configuring lazily keeps the import side-effect free
+    and spares short invocations the handler and log-file setup until
+    main() actually runs; embedders that already installed handlers
+    keep them.
+    """
+    if not logging.getLogger().handlers:
+        logging.config.dictConfig(settings.get_logging_config())
+        start_log_listener()
+
+# stdout is block-buffered when piped; line buffering delivers each JSON
+# line as it is written without an explicit flush per message
+try:
+    sys.stdout.reconfigure(line_buffering=True)
+except (AttributeError, ValueError):
+    pass
+
+# Most messages carry no data payload, so their JSON shape is constant:
+# type and status are internal identifiers and only the free-form message
+# needs escaping. One %-format fills the line without a dict walk.
+_PLAIN_MSG_TMPL = '{"type":"%s","timestamp":"%s","status":"%s","message":%s}\n'
+
+# Last formatted timestamp, keyed by millisecond (see _utc_timestamp)
+_ts_cache: Tuple[int, str] = (0, "")
+
+
+def _utc_timestamp() -> str:
+    """ISO-8601 UTC timestamp, formatted at most once per millisecond.
+
+    datetime.now + isoformat does a timezone lookup and string build on
+    every call; bursts of progress events in the same millisecond share
+    one result instead.
+    """
+    global _ts_cache
+    now_ms = time.time_ns() // 1_000_000
+    cached_ms, cached_str = _ts_cache
+    if now_ms != cached_ms:
+        cached_str = datetime.fromtimestamp(now_ms / 1000, timezone.utc).isoformat()
+        _ts_cache = (now_ms, cached_str)
+    return cached_str
+
+
 def output_message(
     msg_type: str, status: str, message: str, data: Optional[Dict[str, Any]] = None
 ) -> None:
     """Output a structured message to STDOUT."""
+    timestamp = _utc_timestamp()
+
+    if data is None:
+        sys.stdout.write(
+            _PLAIN_MSG_TMPL % (msg_type, timestamp, status, json.dumps(message))
+        )
+        return
+
     output = {
         "type": msg_type,
-        "timestamp": datetime.now(timezone.utc).isoformat(),
+        "timestamp": timestamp,
         "status": status,
         "message": message,
+        "data": data,
     }
 
-    if data:
-        output["data"] = data
+    # Write to STDOUT as a single line; orjson serializes in C. The write
+    # must go through the text layer - line buffering is a text-wrapper
+    # feature, and bytes written to sys.stdout.buffer directly would wait
+    # in the block buffer instead of being delivered per line.
+    if orjson is not None:
+        sys.stdout.write(
+            orjson.dumps(output, option=orjson.OPT_APPEND_NEWLINE).decode()
+        )
+    else:
+        sys.stdout.write(json.dumps(output) + "\n")
 
-    # Write to STDOUT as a single line
-    sys.stdout.write(json.dumps(output) + "\n")
-    sys.stdout.flush()
+    # Belt and braces for streams where line buffering could not be
+    # enabled: terminal messages always reach the consumer immediately
+    if msg_type in ("result", "error"):
+        sys.stdout.flush()
 
 
 def process_restore_command(command: Dict[str, Any]) -> int:
@@ -57,14 +125,13 @@ def process_restore_command(command: Dict[str, Any]) -> int:
         resolver = ResourceResolver()
         resource_path = resolver.resolve(resource_uri)
 
-        # Set up connection dictionary with retry parameters
-        mssql_connection = settings.mssql.get_connection_dict()
-        mssql_connection.update(
-            {
-                "retry_attempts": settings.backup.retry_attempts,
-                "retry_delay": settings.backup.retry_delay,
-            }
-        )
+        # Set up connection dictionary with retry parameters; copy so the
+        # cached settings dict is never mutated
+        mssql_connection = {
+            **settings.mssql.connection_dict,
+            "retry_attempts": settings.backup.retry_attempts,
+            "retry_delay": settings.backup.retry_delay,
+        }
 
         # Process the backup
         processor = BackupProcessor(
@@ -108,7 +175,21 @@ def process_restore_command(command: Dict[str, Any]) -> int:
 
 def main() -> int:
     """Main entry point for the MSSQL tool."""
+    _configure_logging()
+
     try:
+        # Interactive invocation with nothing piped in: explain the
+        # protocol instead of blocking on a read that will never return
+        if sys.stdin.isatty():
+            output_message(
+                "error",
+                "failed",
+                'No command on STDIN; pipe a JSON command, e.g. '
+                'echo \'{"command": "restore", "resource": "file:///backup.dat"}\'',
+                {"code": "NO_INPUT"},
+            )
+            return 1
+
         # Read command from STDIN
         command_str = sys.stdin.read().strip()
         if not command_str: